@@ -5,10 +5,17 @@
 """
 import os
 import re
+import sys
 import json
+import time
+import zlib
+import atexit
 import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Blueprint, Response, render_template, jsonify, request, g, stream_with_context
 
 app = Flask(__name__)
 
@@ -16,8 +23,29 @@ app = Flask(__name__)
 TASKS_DIR = os.environ.get('TASKS_DIR', '/home/jetson/.openclaw/workspace/memory/tasks/checklists')
 ARCHIVED_DIR = os.environ.get('ARCHIVED_DIR', '/home/jetson/.openclaw/workspace/memory/tasks/archived')
 
-# 确保归档目录存在
-os.makedirs(ARCHIVED_DIR, exist_ok=True)
+# 多工作区: WORKSPACES="name=/path/to/workspace,name2=/path/to/workspace2"
+# 每个工作区使用 <path>/memory/tasks/checklists 与 <path>/memory/tasks/archived，
+# TASKS_DIR / ARCHIVED_DIR 始终作为 default 工作区
+WORKSPACES = os.environ.get('WORKSPACES', '')
+DEFAULT_WORKSPACE = 'default'
+
+# 所有工作区共享的解析线程池大小
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+
+# UltraWork 流式导入: Markdown 单行 / NDJSON 单个文档的字节上限
+ULTRAWORK_MAX_LINE_BYTES = int(os.environ.get('ULTRAWORK_MAX_LINE_BYTES', 64 * 1024))
+ULTRAWORK_MAX_DOCUMENT_BYTES = int(os.environ.get('ULTRAWORK_MAX_DOCUMENT_BYTES', 4 * 1024 * 1024))
+
+# 目录扫描结果的新鲜期（秒）：期间内的请求直接复用上一次扫描结果，0 表示只合并并发请求
+SCAN_FRESHNESS = float(os.environ.get('SCAN_FRESHNESS', 1.0))
+
+# 统计快照间隔（秒）
+STATS_SNAPSHOT_INTERVAL = int(os.environ.get('STATS_SNAPSHOT_INTERVAL', 300))
+
+# 归档段文件大小上限（字节），超过后切换到新段
+ARCHIVE_SEGMENT_MAX_BYTES = int(os.environ.get('ARCHIVE_SEGMENT_MAX_BYTES', 8 * 1024 * 1024))
+# 已封存段的垃圾占比达到该值时触发后台压缩
+ARCHIVE_COMPACT_RATIO = float(os.environ.get('ARCHIVE_COMPACT_RATIO', 0.5))
 
 # 智能体颜色映射
 AGENT_COLORS = {
@@ -37,6 +65,229 @@ AGENT_ICONS = {
     '舆探': '🟣'
 }
 
+class TaskRecord:
+    """常驻索引中的紧凑任务记录
+
+    使用 __slots__ 代替 dict；智能体/状态等重复字符串经 sys.intern 共享，
+    目录路径按目录共享，Phase 子任务以名称元组 + 完成位图存储。
+    只在序列化时通过 to_dict() 展开为 API 原有的 dict 结构。
+    """
+    __slots__ = (
+        'directory', 'filename', 'title', 'status', 'status_text',
+        'agent_icon', 'agent_name', 'sort_order', 'completed', 'total',
+        'current_phase', 'phases', 'created_at', 'updated_at', 'owner',
+        'blocker', 'execution_records'
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    @property
+    def id(self):
+        return self.filename.replace('.md', '') if self.filename else 'unknown'
+
+    @property
+    def filepath(self):
+        if self.filename is None:
+            return None
+        return os.path.join(self.directory, self.filename)
+
+    def to_dict(self):
+        """展开为 API 使用的 dict"""
+        phase_list = []
+        for i, (name, names, done_mask) in enumerate(self.phases):
+            done = bin(done_mask).count('1')
+            phase_list.append({
+                'id': f'phase_{i+1}',
+                'name': name,
+                'tasks': [{'name': n, 'completed': bool(done_mask >> j & 1)} for j, n in enumerate(names)],
+                'progress': int(done / len(names) * 100) if names else 0
+            })
+
+        return {
+            'id': self.id,
+            'title': self.title,
+            'status': self.status,
+            'status_text': self.status_text,
+            'agent_icon': self.agent_icon,
+            'agent_name': self.agent_name,
+            'agent_color': AGENT_COLORS.get(self.agent_name, 'blue'),
+            'sort_order': self.sort_order,
+            'progress': f"{self.completed}/{self.total}",
+            'progress_percent': int(self.completed / self.total * 100) if self.total > 0 else 0,
+            'current_phase': self.current_phase,
+            'phase_list': phase_list,  # 🟡 P1 Feature 7: 添加所有 Phases
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'owner': self.owner,
+            'blocker': self.blocker,
+            'execution_records': [{'time': t, 'action': a} for t, a in self.execution_records],
+            'filepath': self.filepath
+        }
+
+class _ScanFlight:
+    """一次进行中的目录扫描，供并发请求等待并共享结果"""
+    __slots__ = ('done', 'result', 'error', 'stats')
+
+    def __init__(self, stats):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.stats = stats  # {'started_at', 'duration_ms', 'served'}
+
+class TaskIndex:
+    """目录任务索引：按 (mtime, size) 缓存 TaskRecord，只重新解析变更的文件
+
+    对目录扫描做单飞合并（single-flight）：同一时刻只有一个请求执行扫描，
+    并发请求等待并共享其结果；扫描完成后 SCAN_FRESHNESS 秒内的请求直接复用结果。
+    本进程内的写操作通过 invalidate() 使结果立即失效。
+    """
+
+    def __init__(self, directory):
+        self.directory = sys.intern(directory)
+        self._entries = {}  # filename -> (mtime_ns, size, TaskRecord)
+        self._lock = threading.Lock()  # 保护下面的状态
+        self._scan_lock = threading.Lock()  # 串行化实际扫描（_entries 只在此锁内修改）
+        self._generation = 0
+        self._inflight = None  # 进行中的 _ScanFlight
+        self._snapshot = None  # (generation, scanned_at, records, scan stats)
+        self._counters = {'requests': 0, 'scans': 0, 'coalesced': 0, 'fresh_hits': 0}
+        self._recent_scans = deque(maxlen=20)
+
+    def records(self):
+        """返回目录下所有任务记录（已与磁盘同步，或在新鲜期内）"""
+        with self._lock:
+            self._counters['requests'] += 1
+            snapshot = self._snapshot
+            if snapshot and snapshot[0] == self._generation and time.monotonic() - snapshot[1] < SCAN_FRESHNESS:
+                self._counters['fresh_hits'] += 1
+                snapshot[3]['served'] += 1
+                return snapshot[2]
+
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                stats = {'started_at': datetime.now().isoformat(), 'duration_ms': None, 'served': 1}
+                flight = self._inflight = _ScanFlight(stats)
+                generation = self._generation
+                self._counters['scans'] += 1
+                self._recent_scans.append(stats)
+            else:
+                self._counters['coalesced'] += 1
+                flight.stats['served'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        started = time.monotonic()
+        try:
+            with self._scan_lock:
+                flight.result = self._scan()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight is flight:
+                    self._inflight = None
+                flight.stats['duration_ms'] = int((time.monotonic() - started) * 1000)
+                if flight.error is None:
+                    self._snapshot = (generation, time.monotonic(), flight.result, flight.stats)
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self):
+        """目录已被本进程修改：丢弃新鲜期内的结果，后续请求重新扫描"""
+        with self._lock:
+            self._generation += 1
+            # 进行中的扫描可能早于本次修改，新请求不再加入它
+            self._inflight = None
+
+    def scan_stats(self):
+        """扫描合并计数：总请求、实际扫描、合并等待、新鲜期命中，以及最近每次扫描服务的请求数"""
+        with self._lock:
+            return dict(self._counters, recent_scans=[dict(s) for s in self._recent_scans])
+
+    def _scan(self):
+        if not os.path.exists(self.directory):
+            self._entries.clear()
+            return []
+
+        seen = set()
+        changed = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                filename = entry.name
+                if not filename.endswith('.md') or filename.startswith('TEMPLATE'):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                seen.add(filename)
+                cached = self._entries.get(filename)
+                if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    continue
+                changed.append((filename, entry.path, st.st_mtime_ns, st.st_size))
+
+        for filename, mtime_ns, size, record in _parse_in_pool(changed):
+            if record:
+                self._entries[filename] = (mtime_ns, size, record)
+            else:
+                self._entries.pop(filename, None)
+
+        for filename in list(self._entries):
+            if filename not in seen:
+                del self._entries[filename]
+
+        return [cached[2] for cached in self._entries.values()]
+
+# 共享解析线程池：所有工作区的索引共用，线程数受 PARSE_WORKERS 限制
+_parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+
+def _parse_in_pool(changed):
+    """在共享线程池中解析变更文件
+
+    每个调用方最多同时提交 PARSE_WORKERS 个解析任务，
+    大量变更的工作区不会独占队列，其他工作区的解析可以穿插执行。
+    """
+    pending = deque()
+    for filename, filepath, mtime_ns, size in changed:
+        if len(pending) >= PARSE_WORKERS:
+            yield pending.popleft().result()
+        pending.append(_parse_pool.submit(_parse_changed, filename, filepath, mtime_ns, size))
+    while pending:
+        yield pending.popleft().result()
+
+def _parse_changed(filename, filepath, mtime_ns, size):
+    return filename, mtime_ns, size, parse_markdown_record(filepath)
+
+_task_indexes = {}
+_task_indexes_lock = threading.Lock()
+
+def get_task_index(directory):
+    """获取目录对应的任务索引（按目录懒创建）"""
+    with _task_indexes_lock:
+        index = _task_indexes.get(directory)
+        if index is None:
+            index = _task_indexes[directory] = TaskIndex(directory)
+        return index
+
+def parse_markdown_record(filepath):
+    """解析 Markdown 任务文件为 TaskRecord"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        return _parse_record(content, filepath)
+    except Exception as e:
+        print(f"Error parsing {filepath}: {e}")
+        return None
+
 def parse_markdown_file(filepath, include_full=False):
     """解析 Markdown 任务文件"""
     try:
@@ -49,7 +300,14 @@ def parse_markdown_file(filepath, include_full=False):
         return None
 
 def _parse_content(content, filepath=None, include_full=False):
-    """解析 Markdown 内容"""
+    """解析 Markdown 内容，返回可直接序列化的 dict"""
+    task = _parse_record(content, filepath).to_dict()
+    if include_full:
+        task['full_content'] = content
+    return task
+
+def _parse_record(content, filepath=None):
+    """解析 Markdown 内容为紧凑的 TaskRecord"""
     
     # 🔴 Bug 4 Fix: 增强任务名称解析（支持多种格式）
     # 格式1: # 任务清单: AI Agents 汉化项目
@@ -146,18 +404,8 @@ def _parse_content(content, filepath=None, include_full=False):
     
     # 🟡 P1 Feature 7: 提取所有 Phases（支持 UltraWork 格式）
     phases = re.findall(r'(Phase \d+[:：]?\s*(?:.*?))(?=Phase \d+|## |$)', content, re.DOTALL)
-    phase_list = []
-    for i, phase in enumerate(phases):
-        phase_name = phase.split('\n')[0].strip()
-        phase_tasks = re.findall(r'- \[ \]\s*(.+)|- \[x\]\s*(.+)', phase)
-        completed = sum(1 for t in phase_tasks if t[1])
-        total = len(phase_tasks)
-        phase_list.append({
-            'id': f'phase_{i+1}',
-            'name': phase_name,
-            'tasks': [{'name': t[0] or t[1], 'completed': bool(t[1])} for t in phase_tasks],
-            'progress': int(completed / total * 100) if total > 0 else 0
-        })
+    # 紧凑存储: (名称, 子任务名称元组, 完成位图)
+    phase_list = tuple(_compact_phase(phase) for phase in phases)
     
     # 提取阻塞点
     blocker_match = re.search(r'阻塞点[:：]?\s*(.+?)(?=\n## |\n$|$)', content, re.DOTALL)
@@ -165,33 +413,43 @@ def _parse_content(content, filepath=None, include_full=False):
     
     # 提取执行记录
     execution_match = re.findall(r'(\d{4}-\d{2}-\d{2}\s*\d{2}:\d{2})[:：]\s*(.+?)(?=\n\d{4}-\d{2}-\d{2}|## |$)', content, re.DOTALL)
-    execution_records = [{'time': t, 'action': a.strip()} for t, a in execution_match[:5]] if execution_match else []
-    
-    task = {
-        'id': os.path.basename(filepath).replace('.md', '') if filepath else 'unknown',
-        'title': title,
-        'status': status,
-        'status_text': status_text,
-        'agent_icon': agent_icon,
-        'agent_name': agent_name,
-        'agent_color': AGENT_COLORS.get(agent_name, 'blue'),
-        'sort_order': sort_order,
-        'progress': f"{completed_checkboxes}/{total_checkboxes}",
-        'progress_percent': progress,
-        'current_phase': current_phase,
-        'phase_list': phase_list,  # 🟡 P1 Feature 7: 添加所有 Phases
-        'created_at': created_at,
-        'updated_at': updated_at,
-        'owner': owner,
-        'blocker': blocker,
-        'execution_records': execution_records,
-        'filepath': filepath
-    }
+    execution_records = tuple((t, a.strip()) for t, a in execution_match[:5])
     
-    if include_full:
-        task['full_content'] = content
+    if filepath:
+        directory, filename = os.path.split(filepath)
+    else:
+        directory, filename = None, None
     
-    return task
+    return TaskRecord(
+        directory=sys.intern(directory) if directory is not None else None,
+        filename=filename,
+        title=title,
+        status=sys.intern(status),
+        status_text=sys.intern(status_text),
+        agent_icon=sys.intern(agent_icon),
+        agent_name=sys.intern(agent_name),
+        sort_order=sort_order,
+        completed=completed_checkboxes,
+        total=total_checkboxes,
+        current_phase=current_phase,
+        phases=phase_list,
+        created_at=created_at,
+        updated_at=updated_at,
+        owner=sys.intern(owner),
+        blocker=blocker,
+        execution_records=execution_records,
+    )
+
+def _compact_phase(phase):
+    """把 Phase 文本压缩为 (名称, 子任务名称元组, 完成位图)"""
+    phase_name = phase.split('\n')[0].strip()
+    phase_tasks = re.findall(r'- \[ \]\s*(.+)|- \[x\]\s*(.+)', phase)
+    names = tuple(t[0] or t[1] for t in phase_tasks)
+    done_mask = 0
+    for i, t in enumerate(phase_tasks):
+        if t[1]:
+            done_mask |= 1 << i
+    return (phase_name, names, done_mask)
 
 def get_tasks_by_status(tasks):
     """按状态分组任务"""
@@ -214,8 +472,16 @@ def get_tasks_by_status(tasks):
     
     return planned, in_progress, completed
 
+def get_task_records_from_dir(directory):
+    """从目录索引获取所有任务记录（TaskRecord）"""
+    return get_task_index(directory).records()
+
 def get_all_tasks_from_dir(directory, include_full=False):
     """从目录获取所有任务"""
+    if not include_full:
+        return [record.to_dict() for record in get_task_records_from_dir(directory)]
+    
+    # 全文内容不进入常驻索引，直接读取
     tasks = []
     if os.path.exists(directory):
         for filename in os.listdir(directory):
@@ -226,15 +492,662 @@ def get_all_tasks_from_dir(directory, include_full=False):
                     tasks.append(task)
     return tasks
 
+# 统计历史汇总粒度: (名称, 秒数, 分区文件名格式)
+# 分钟汇总按天分区，小时汇总按月分区，天汇总按年分区
+HISTORY_LEVELS = (
+    ('minute', 60, '%Y-%m-%d'),
+    ('hour', 3600, '%Y-%m'),
+    ('day', 86400, '%Y'),
+)
+
+# 单次历史查询最多返回的数据点
+HISTORY_MAX_POINTS = 5000
+
+def _bucket_start(ts, size):
+    """按本地时间对齐的桶起点（epoch 秒）"""
+    offset = time.localtime(ts).tm_gmtoff
+    return int((ts + offset) // size * size - offset)
+
+class StatsHistory:
+    """统计历史：追加写入的状态流转事件 + 分钟/小时/天汇总
+
+    目录结构:
+        events/<YYYY-MM-DD>.jsonl   原始状态流转事件
+        minute/<YYYY-MM-DD>.jsonl   分钟汇总
+        hour/<YYYY-MM>.jsonl        小时汇总
+        day/<YYYY>.jsonl            天汇总
+        open.json                   未结束桶的检查点与对应的事件日志位置
+
+    汇总行字段: t 桶起点, a 智能体, s 状态流转数, n 完成数,
+    c/k 周期时间（秒）总和/样本数, tot/done 桶内最后一次快照的总数/已完成数。
+    当前未结束的桶保存在内存中，跨桶或进程退出时追加到文件；每次快照和跨桶时
+    写入检查点。进程被直接终止（如 SIGTERM）后，启动时从检查点恢复未结束的桶，
+    并重放检查点之后的原始事件。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.checkpoint_path = os.path.join(root, 'open.json')
+        self._lock = threading.Lock()
+        self._open = {}  # level name -> (bucket_start, {agent: row})
+        self._event_pos = None  # (事件文件名, 偏移)，检查点之后的事件需要重放
+        self._needs_checkpoint = False
+        self._snapshot_thread = None
+        with self._lock:
+            self._recover()
+        atexit.register(self.flush)
+
+    def record_transition(self, agent, old_status, new_status, cycle_seconds=None, ts=None):
+        """记录一次状态流转"""
+        ts = time.time() if ts is None else ts
+        event = {'t': int(ts), 'a': agent, 'f': old_status, 's': new_status}
+        if cycle_seconds is not None:
+            event['c'] = int(cycle_seconds)
+
+        with self._lock:
+            filename = time.strftime('%Y-%m-%d', time.localtime(ts)) + '.jsonl'
+            path = os.path.join(self.root, 'events', filename)
+            self._append(path, [event])
+            self._event_pos = (filename, os.path.getsize(path))
+            self._apply_transition(event)
+            if self._needs_checkpoint:
+                self._checkpoint()
+
+    def record_snapshot(self, by_agent, ts=None):
+        """记录一次汇总快照，by_agent: {agent: (total, completed)}"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for level in HISTORY_LEVELS:
+                for agent, (total, completed) in by_agent.items():
+                    row = self._row(level, ts, agent)
+                    row['tot'] = total
+                    row['done'] = completed
+            self._checkpoint()
+
+    def flush(self):
+        """把所有未结束的桶写入文件"""
+        with self._lock:
+            for level in HISTORY_LEVELS:
+                current = self._open.pop(level[0], None)
+                if current:
+                    self._flush_bucket(level, *current)
+            self._checkpoint()
+
+    def start_snapshots(self, collect):
+        """启动后台快照线程（每个 StatsHistory 只启动一次）"""
+        with self._lock:
+            if self._snapshot_thread is not None:
+                return
+            self._snapshot_thread = threading.Thread(
+                target=self._snapshot_loop, args=(collect,),
+                name='stats-snapshot', daemon=True
+            )
+        self._snapshot_thread.start()
+
+    def query(self, start, end, step, agent=None):
+        """按 step 聚合 [start, end) 的历史，只读取所需粒度的汇总文件"""
+        name, size, fmt = max(
+            (level for level in HISTORY_LEVELS if step % level[1] == 0),
+            key=lambda level: level[1]
+        )
+
+        buckets = {}
+        for row in self._rows(name, fmt, start, end):
+            if not start <= row['t'] < end:
+                continue
+            if agent and row['a'] != agent:
+                continue
+            bucket = buckets.setdefault(_bucket_start(row['t'], step), {
+                'n': 0, 's': 0, 'c': 0, 'k': 0, 'snapshots': {}
+            })
+            for key in ('n', 's', 'c', 'k'):
+                bucket[key] += row.get(key, 0)
+            if 'tot' in row:
+                # 行按时间顺序读取，保留每个智能体在桶内的最后一次快照
+                bucket['snapshots'][row['a']] = (row['tot'], row['done'])
+
+        points = []
+        for t in sorted(buckets):
+            bucket = buckets[t]
+            point = {
+                'time': datetime.fromtimestamp(t).isoformat(),
+                'throughput': bucket['n'],
+                'transitions': bucket['s'],
+                'avg_cycle_hours': round(bucket['c'] / bucket['k'] / 3600, 2) if bucket['k'] else None,
+                'total': None,
+                'completed': None,
+                'completion_rate': None
+            }
+            if bucket['snapshots']:
+                total = sum(tot for tot, _ in bucket['snapshots'].values())
+                completed = sum(done for _, done in bucket['snapshots'].values())
+                point.update({
+                    'total': total,
+                    'completed': completed,
+                    'completion_rate': int(completed / total * 100) if total > 0 else 0
+                })
+            points.append(point)
+        return name, points
+
+    def _rows(self, name, fmt, start, end):
+        """读取与时间范围重叠的汇总分区，以及内存中未结束的桶"""
+        directory = os.path.join(self.root, name)
+        first = time.strftime(fmt, time.localtime(start))
+        last = time.strftime(fmt, time.localtime(end))
+        if os.path.exists(directory):
+            for filename in sorted(os.listdir(directory)):
+                if not filename.endswith('.jsonl') or not first <= filename[:-6] <= last:
+                    continue
+                with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            # 跳过空行或被中断写入的半行
+                            continue
+
+        with self._lock:
+            current = self._open.get(name)
+            open_rows = [dict(row, t=current[0], a=agent) for agent, row in current[1].items()] if current else []
+        yield from open_rows
+
+    def _row(self, level, ts, agent):
+        """获取当前桶中智能体的汇总行，跨桶时先落盘旧桶"""
+        name, size, fmt = level
+        start = _bucket_start(ts, size)
+        current = self._open.get(name)
+        if current is None or current[0] != start:
+            if current:
+                self._flush_bucket(level, *current)
+                # 旧桶已落盘，需要更新检查点，避免重放时重复写入
+                self._needs_checkpoint = True
+            current = self._open[name] = (start, {})
+        return current[1].setdefault(agent, {})
+
+    def _apply_transition(self, event):
+        for level in HISTORY_LEVELS:
+            row = self._row(level, event['t'], event['a'])
+            row['s'] = row.get('s', 0) + 1
+            if event['s'] == '✅':
+                row['n'] = row.get('n', 0) + 1
+                if 'c' in event:
+                    row['c'] = row.get('c', 0) + event['c']
+                    row['k'] = row.get('k', 0) + 1
+
+    def _checkpoint(self):
+        """原子写入未结束的桶与当前事件日志位置"""
+        os.makedirs(self.root, exist_ok=True)
+        state = {
+            'open': {name: [start, rows] for name, (start, rows) in self._open.items()},
+            'events': list(self._event_pos) if self._event_pos else None
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.checkpoint_path)
+        self._needs_checkpoint = False
+
+    def _recover(self):
+        """从检查点恢复未结束的桶，并重放检查点之后追加的原始事件"""
+        events_dir = os.path.join(self.root, 'events')
+        event_files = sorted(
+            name for name in os.listdir(events_dir) if name.endswith('.jsonl')
+        ) if os.path.exists(events_dir) else []
+
+        state = None
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except ValueError as e:
+                print(f"Error loading stats checkpoint {self.checkpoint_path}: {e}")
+
+        if state is None:
+            # 没有检查点（新建或旧版本数据）：不重放，从现有事件末尾开始
+            if event_files:
+                last = event_files[-1]
+                self._event_pos = (last, os.path.getsize(os.path.join(events_dir, last)))
+            self._checkpoint()
+            return
+
+        self._open = {name: (start, rows) for name, (start, rows) in state.get('open', {}).items()}
+        pos = state.get('events')
+        first, offset = pos if pos else (None, 0)
+        replayed = 0
+        for filename in event_files:
+            if first is not None and filename < first:
+                continue
+            path = os.path.join(events_dir, filename)
+            with open(path, 'rb') as f:
+                if filename == first:
+                    f.seek(offset)
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._apply_transition(event)
+                    replayed += 1
+            self._event_pos = (filename, os.path.getsize(path))
+        if replayed:
+            print(f"Replayed {replayed} stats events into {self.root}")
+        self._checkpoint()
+
+    def _flush_bucket(self, level, start, rows):
+        name, size, fmt = level
+        partition = time.strftime(fmt, time.localtime(start))
+        self._append(
+            os.path.join(self.root, name, f'{partition}.jsonl'),
+            [dict(row, t=start, a=agent) for agent, row in rows.items()]
+        )
+
+    def _append(self, path, items):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def _snapshot_loop(self, collect):
+        while True:
+            try:
+                self.record_snapshot(collect())
+            except Exception as e:
+                print(f"Error recording stats snapshot: {e}")
+            time.sleep(STATS_SNAPSHOT_INTERVAL)
+
+def _fsync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+def _fsync_dir(path):
+    """fsync 目录，使文件创建/重命名落盘（不支持的平台忽略）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class ArchiveStore:
+    """归档段存储：归档任务追加写入压缩段文件，通过偏移索引随机读取
+
+    目录结构:
+        segments/<NNNNNN>.seg   段文件，每条记录为 zlib 压缩的 {"id", "content"}
+        archive.idx             追加写入的索引日志，记录位置或删除标记（tombstone）
+
+    content 保留原有的 ---archived_at--- 前缀格式。删除与恢复只写 tombstone，
+    已封存段的垃圾占比达到 ARCHIVE_COMPACT_RATIO 时在后台把存活记录搬到活动段并删除旧段。
+    首次打开时把目录中旧的逐文件归档（*.md）一次性导入段存储，段与索引 fsync 落盘后
+    原文件移动到 legacy/ 备份目录；无法读取的文件记录日志并保留原处。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments_dir = os.path.join(directory, 'segments')
+        self.index_path = os.path.join(directory, 'archive.idx')
+        self.legacy_dir = os.path.join(directory, 'legacy')
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._entries = {}  # task_id -> (segment, offset, length, archived_at)
+        self._live = {}  # segment -> 存活字节数
+        self._records = None  # task_id -> TaskRecord，首次列出时构建
+        self._active = 1
+        self._compacting = False
+        self._unsynced = set()  # 追加后尚未 fsync 的段编号
+
+    def records(self):
+        """返回所有归档任务 (TaskRecord, archived_at)"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._records is None:
+                # 按段内偏移顺序读取，保持顺序 I/O
+                records = {}
+                for task_id, entry in sorted(self._entries.items(), key=lambda item: item[1][:2]):
+                    try:
+                        records[task_id] = self._parse(task_id, self._read(*entry[:3]))
+                    except Exception as e:
+                        print(f"Error reading archived task {task_id} from segment {entry[0]}: {e}")
+                self._records = records
+            return [(record, self._entries[task_id][3]) for task_id, record in self._records.items()]
+
+    def get(self, task_id):
+        """读取归档任务内容，不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return None
+            return self._read(*entry[:3])
+
+    def put(self, task_id, content):
+        """追加归档任务（同一 ID 再次归档时覆盖旧记录）"""
+        with self._lock:
+            self._ensure_loaded()
+            self._append(task_id, content)
+        self._maybe_compact()
+
+    def delete(self, task_id):
+        """写入 tombstone，返回任务是否存在"""
+        with self._lock:
+            self._ensure_loaded()
+            if task_id not in self._entries:
+                return False
+            entry = {'id': task_id, 'del': 1}
+            self._log(entry)
+            self._apply(entry)
+        self._maybe_compact()
+        return True
+
+    def compact(self):
+        """把垃圾占比高的已封存段中的存活记录搬到活动段，然后删除旧段并重写索引"""
+        try:
+            with self._lock:
+                self._ensure_loaded()
+                segments = self._compactable()
+            for segment in segments:
+                # 每个段单独持锁，压缩期间请求仍可穿插执行
+                with self._lock:
+                    for task_id, entry in list(self._entries.items()):
+                        if entry[0] == segment:
+                            self._append(task_id, self._read(*entry[:3]), entry[3])
+                    # 新位置已落盘后才删除旧段
+                    self._sync()
+                    os.remove(self._segment_path(segment))
+                    self._live.pop(segment, None)
+            if segments:
+                with self._lock:
+                    self._rewrite_index()
+        finally:
+            self._compacting = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self._entries.clear()
+        self._live.clear()
+        if os.path.exists(self.index_path):
+            self._replay_index()
+        segments = self._segment_numbers()
+        self._active = segments[-1] if segments else 1
+        self._import_legacy_files()
+        self._loaded = True
+
+    def _replay_index(self):
+        """重放索引日志：截掉被中断写入的末行，跳过无法解析的行"""
+        with open(self.index_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                # 末行写入被中断：截断到最后一个完整行，后续追加从新行开始
+                cut = data.rfind(b'\n') + 1
+                print(f"Truncating torn entry at end of {self.index_path}: {data[cut:]!r}")
+                f.truncate(cut)
+                data = data[:cut]
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Error replaying archive index entry {line!r}: {e}")
+
+    def _import_legacy_files(self):
+        """一次性导入旧的逐文件归档"""
+        imported = []
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith('.md') and not filename.startswith('TEMPLATE'):
+                filepath = os.path.join(self.directory, filename)
+                try:
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                    self._append(filename.replace('.md', ''), content)
+                except Exception as e:
+                    print(f"Error importing archived task {filepath}: {e}")
+                    continue
+                imported.append(filename)
+        if not imported:
+            return
+
+        # 段与索引落盘后才移走原文件，断电时最多重复导入
+        self._sync()
+        os.makedirs(self.legacy_dir, exist_ok=True)
+        for filename in imported:
+            os.replace(os.path.join(self.directory, filename), os.path.join(self.legacy_dir, filename))
+        _fsync_dir(self.directory)
+        print(f"Imported {len(imported)} archived tasks into {self.segments_dir}, originals moved to {self.legacy_dir}")
+
+    def _append(self, task_id, content, archived_at=None):
+        payload = zlib.compress(json.dumps({'id': task_id, 'content': content}, ensure_ascii=False).encode('utf-8'))
+        path = self._segment_path(self._active)
+        if os.path.exists(path) and 0 < os.path.getsize(path) and os.path.getsize(path) + len(payload) > ARCHIVE_SEGMENT_MAX_BYTES:
+            self._active += 1
+            path = self._segment_path(self._active)
+
+        with open(path, 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(payload)
+        self._unsynced.add(self._active)
+
+        if archived_at is None:
+            match = re.match(r'---\narchived_at:\s*(.+?)\n---', content)
+            archived_at = match.group(1).strip() if match else None
+        entry = {'id': task_id, 'seg': self._active, 'off': offset, 'len': len(payload), 'at': archived_at}
+        self._log(entry)
+        self._apply(entry)
+        if self._records is not None:
+            self._records[task_id] = self._parse(task_id, content)
+
+    def _apply(self, entry):
+        """把一条索引日志应用到内存索引"""
+        # 先取出所有字段，格式错误时不改动内存索引
+        task_id = entry['id']
+        new = None if entry.get('del') else (entry['seg'], entry['off'], entry['len'], entry.get('at'))
+        old = self._entries.pop(task_id, None)
+        if old is not None:
+            self._live[old[0]] = self._live.get(old[0], 0) - old[2]
+        if new is None:
+            if self._records is not None:
+                self._records.pop(task_id, None)
+            return
+        self._entries[task_id] = new
+        self._live[new[0]] = self._live.get(new[0], 0) + new[2]
+
+    def _log(self, entry):
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def _rewrite_index(self):
+        """用存活记录重写索引日志，丢弃历史与 tombstone"""
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for task_id, (segment, offset, length, archived_at) in self._entries.items():
+                entry = {'id': task_id, 'seg': segment, 'off': offset, 'len': length, 'at': archived_at}
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        _fsync_dir(self.directory)
+
+    def _sync(self):
+        """fsync 已追加的段文件与索引日志"""
+        for segment in self._unsynced:
+            path = self._segment_path(segment)
+            if os.path.exists(path):
+                _fsync_file(path)
+        self._unsynced.clear()
+        if os.path.exists(self.index_path):
+            _fsync_file(self.index_path)
+        _fsync_dir(self.segments_dir)
+        _fsync_dir(self.directory)
+
+    def _read(self, segment, offset, length):
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            payload = f.read(length)
+        return json.loads(zlib.decompress(payload).decode('utf-8'))['content']
+
+    def _parse(self, task_id, content):
+        return _parse_record(content, os.path.join(self.directory, f"{task_id}.md"))
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting or not self._compactable():
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name='archive-compact', daemon=True).start()
+
+    def _compactable(self):
+        segments = []
+        for segment in self._segment_numbers():
+            if segment == self._active:
+                continue
+            size = os.path.getsize(self._segment_path(segment))
+            live = self._live.get(segment, 0)
+            if size == 0 or 1 - live / size >= ARCHIVE_COMPACT_RATIO:
+                segments.append(segment)
+        return segments
+
+    def _segment_numbers(self):
+        return sorted(
+            int(name[:-4]) for name in os.listdir(self.segments_dir)
+            if name.endswith('.seg') and name[:-4].isdigit()
+        )
+
+    def _segment_path(self, segment):
+        return os.path.join(self.segments_dir, f'{segment:06d}.seg')
+
+class Workspace:
+    """单个 OpenClaw 工作区：任务目录、归档目录、Jobs 存储与统计历史"""
+
+    def __init__(self, name, tasks_dir, archived_dir):
+        self.name = name
+        self.tasks_dir = tasks_dir
+        self.archived_dir = archived_dir
+        self.jobs_file = os.path.join(tasks_dir, '..', 'jobs.json')
+        self.history = StatsHistory(os.path.join(tasks_dir, '..', 'stats_history'))
+        self.archive = ArchiveStore(archived_dir)
+
+        # 确保归档目录存在
+        os.makedirs(archived_dir, exist_ok=True)
+
+    def agent_totals(self):
+        """当前各智能体的 (总数, 已完成数)"""
+        by_agent = {}
+        for task in get_task_records_from_dir(self.tasks_dir):
+            total, completed = by_agent.get(task.agent_name, (0, 0))
+            by_agent[task.agent_name] = (total + 1, completed + (task.status == '✅'))
+        return by_agent
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'tasks_dir': self.tasks_dir,
+            'archived_dir': self.archived_dir
+        }
+
+def load_workspaces(spec):
+    """解析 WORKSPACES 配置，返回 {name: Workspace}"""
+    workspaces = {DEFAULT_WORKSPACE: Workspace(DEFAULT_WORKSPACE, TASKS_DIR, ARCHIVED_DIR)}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition('=')
+        name, path = name.strip(), path.strip()
+        if not sep or not name or not path:
+            raise ValueError(f"Invalid WORKSPACES entry: {item!r}")
+        tasks_root = os.path.join(path, 'memory', 'tasks')
+        workspaces[name] = Workspace(
+            name,
+            os.path.join(tasks_root, 'checklists'),
+            os.path.join(tasks_root, 'archived')
+        )
+    return workspaces
+
+WORKSPACE_MAP = load_workspaces(WORKSPACES)
+
+# API 同时挂载在 /api（default 工作区，或 ?workspace=）和 /api/w/<workspace>
+api = Blueprint('api', __name__)
+
+@api.url_value_preprocessor
+def _pull_workspace(endpoint, values):
+    name = values.pop('workspace', None) if values else None
+    if name is None:
+        name = request.args.get('workspace', DEFAULT_WORKSPACE)
+    g.workspace_name = name
+    g.workspace = WORKSPACE_MAP.get(name)
+
+@api.before_request
+def _require_workspace():
+    if g.workspace is None:
+        return jsonify({'error': f'Workspace not found: {g.workspace_name}'}), 404
+    # 首次访问工作区时启动统计快照（避免在 reloader 父进程中启动）
+    g.workspace.history.start_snapshots(g.workspace.agent_totals)
+
+@api.after_request
+def _invalidate_scans(response):
+    # 写操作后立即失效扫描结果，避免新鲜期内返回旧数据
+    if request.method != 'GET' and g.get('workspace') is not None:
+        get_task_index(g.workspace.tasks_dir).invalidate()
+    return response
+
+def current_workspace():
+    """当前请求对应的工作区"""
+    return g.workspace
+
+def _created_timestamp(content):
+    """任务创建时间（epoch 秒），缺失时返回 None"""
+    match = re.search(r'创建时间[:：]\s*(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})', content)
+    if not match:
+        return None
+    return datetime.strptime(f"{match.group(1)} {match.group(2)}", '%Y-%m-%d %H:%M').timestamp()
+
+def record_status_change(ws, filepath, old_content, new_content):
+    """状态发生变化时写入统计历史"""
+    try:
+        old = _parse_record(old_content, filepath)
+        new = _parse_record(new_content, filepath)
+        if old.status == new.status:
+            return
+        cycle_seconds = None
+        if new.status == '✅':
+            created = _created_timestamp(old_content)
+            if created is not None:
+                cycle_seconds = max(0, time.time() - created)
+        ws.history.record_transition(old.agent_name, old.status, new.status, cycle_seconds)
+    except Exception as e:
+        print(f"Error recording status change for {filepath}: {e}")
+
 @app.route('/')
 def index():
     """渲染主页面"""
-    return render_template('index.html')
+    return render_template('index.html', api_base='/api', workspace=DEFAULT_WORKSPACE, default_workspace=DEFAULT_WORKSPACE)
+
+@app.route('/w/<workspace>/')
+def workspace_index(workspace):
+    """渲染指定工作区的主页面"""
+    if workspace not in WORKSPACE_MAP:
+        return jsonify({'error': f'Workspace not found: {workspace}'}), 404
+    return render_template('index.html', api_base=f'/api/w/{workspace}', workspace=workspace, default_workspace=DEFAULT_WORKSPACE)
+
+@app.route('/api/workspaces')
+def get_workspaces():
+    """获取已配置的工作区"""
+    return jsonify({
+        'workspaces': [ws.to_dict() for ws in WORKSPACE_MAP.values()],
+        'default': DEFAULT_WORKSPACE
+    })
 
-@app.route('/api/tasks')
+@api.route('/tasks')
 def get_tasks():
     """获取所有任务"""
-    tasks = get_all_tasks_from_dir(TASKS_DIR)
+    ws = current_workspace()
+    tasks = get_all_tasks_from_dir(ws.tasks_dir)
     
     # 按状态分组
     planned, in_progress, completed = get_tasks_by_status(tasks)
@@ -263,36 +1176,33 @@ def get_tasks():
         'timestamp': datetime.now().isoformat()
     })
 
-@app.route('/api/tasks/<task_id>')
+@api.route('/tasks/<task_id>')
 def get_task_detail(task_id):
     """获取任务详情"""
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
-    if not os.path.exists(filepath):
-        # 检查归档目录
-        filepath = os.path.join(ARCHIVED_DIR, f"{task_id}.md")
-    
+    ws = current_workspace()
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     if os.path.exists(filepath):
         task = parse_markdown_file(filepath, include_full=True)
         if task:
             return jsonify(task)
     
+    # 检查归档存储
+    content = ws.archive.get(task_id)
+    if content is not None:
+        return jsonify(_parse_content(content, os.path.join(ws.archived_dir, f"{task_id}.md"), include_full=True))
+    
     return jsonify({'error': 'Task not found'}), 404
 
-@app.route('/api/tasks', methods=['POST'])
-def create_task():
-    """创建新任务"""
-    data = request.json
-    title = data.get('title', '新任务')
-    owner = data.get('owner', '未分配')
-    agent = data.get('agent', '老丑')
-    sort_order = data.get('sort_order', 999)
-    
-    # 生成任务ID
-    task_id = datetime.now().strftime('%Y%m%d%H%M%S')
-    created_at = datetime.now().strftime('%Y-%m-%d %H:%M')
-    
-    # 任务内容模板
-    content = f"""# 任务清单：{title}
+# 新建任务模板的默认 Phases
+DEFAULT_PHASES = (
+    ('Phase 1: 准备阶段', (('明确任务目标和范围', False), ('制定详细计划', False), ('分配资源', False))),
+    ('Phase 2: 执行阶段', (('执行核心任务', False), ('定期检查进度', False), ('解决遇到的问题', False))),
+    ('Phase 3: 收尾阶段', (('完成任务验收', False), ('编写文档', False), ('总结经验', False))),
+)
+
+def render_task_header(title, owner, agent, sort_order, created_at):
+    """任务模板：标题、元信息与任务描述"""
+    return f"""# 任务清单：{title}
 
 - 状态: 🔄 进行中
 - 创建时间: {created_at}
@@ -305,35 +1215,47 @@ def create_task():
 
 <!-- 在此添加任务描述 -->
 
-## Phase 1: 准备阶段
-
-- [ ] 明确任务目标和范围
-- [ ] 制定详细计划
-- [ ] 分配资源
-
-## Phase 2: 执行阶段
-
-- [ ] 执行核心任务
-- [ ] 定期检查进度
-- [ ] 解决遇到的问题
-
-## Phase 3: 收尾阶段
+"""
 
-- [ ] 完成任务验收
-- [ ] 编写文档
-- [ ] 总结经验
+def render_phase_section(name, tasks):
+    """任务模板：单个 Phase，tasks 为 (名称, 是否完成) 序列"""
+    checkboxes = ''.join(f"- [{'x' if completed else ' '}] {task}\n" for task, completed in tasks)
+    return f"## {name}\n\n{checkboxes}\n"
 
-## 执行记录
+def render_task_footer(created_at, note='任务创建'):
+    """任务模板：执行记录与阻塞点"""
+    return f"""## 执行记录
 
-{created_at}: 任务创建
+{created_at}: {note}
 
 ## 阻塞点
 
 <!-- 在此记录阻塞点 -->
 
 """
+
+@api.route('/tasks', methods=['POST'])
+def create_task():
+    """创建新任务"""
+    ws = current_workspace()
+    data = request.json
+    title = data.get('title', '新任务')
+    owner = data.get('owner', '未分配')
+    agent = data.get('agent', '老丑')
+    sort_order = data.get('sort_order', 999)
     
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+    # 生成任务ID
+    task_id = datetime.now().strftime('%Y%m%d%H%M%S')
+    created_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+    
+    # 任务内容模板
+    content = (
+        render_task_header(title, owner, agent, sort_order, created_at)
+        + ''.join(render_phase_section(name, tasks) for name, tasks in DEFAULT_PHASES)
+        + render_task_footer(created_at)
+    )
+    
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(content)
     
@@ -343,11 +1265,12 @@ def create_task():
         'message': '任务创建成功'
     })
 
-@app.route('/api/tasks/<task_id>', methods=['PUT'])
+@api.route('/tasks/<task_id>', methods=['PUT'])
 def update_task(task_id):
     """更新任务"""
+    ws = current_workspace()
     data = request.json
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     
     if not os.path.exists(filepath):
         return jsonify({'error': 'Task not found'}), 404
@@ -355,24 +1278,25 @@ def update_task(task_id):
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
+        old_content = content
         
-    # 🔴 Bug 1 Fix: 增强状态更新逻辑
-    # 确保状态行格式统一
-    if 'status' in data:
-        # 查找并替换状态行，支持多种格式
-        old_patterns = [
-            r'[-*]\s*[*]?状态[*]?[:：]\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)',
-            r'状态[:：]\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)',
-            r'状态:\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)'
-        ]
-        for pattern in old_patterns:
-            if re.search(pattern, content):
-                content = re.sub(
-                    pattern,
-                    f"状态: {data['status']} {'进行中' if data['status'] == '🔄' else '已完成' if data['status'] == '✅' else '已暂停'}",
-                    content
-                )
-                break
+        # 🔴 Bug 1 Fix: 增强状态更新逻辑
+        # 确保状态行格式统一
+        if 'status' in data:
+            # 查找并替换状态行，支持多种格式
+            old_patterns = [
+                r'[-*]\s*[*]?状态[*]?[:：]\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)',
+                r'状态[:：]\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)',
+                r'状态:\s*(🔄|✅|❌)\s*(进行中|已完成|已暂停)'
+            ]
+            for pattern in old_patterns:
+                if re.search(pattern, content):
+                    content = re.sub(
+                        pattern,
+                        f"状态: {data['status']} {'进行中' if data['status'] == '🔄' else '已完成' if data['status'] == '✅' else '已暂停'}",
+                        content
+                    )
+                    break
         
         # 更新排序
         if 'sort_order' in data:
@@ -392,32 +1316,32 @@ def update_task(task_id):
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
+        record_status_change(ws, filepath, old_content, content)
         
         return jsonify({'success': True, 'updated_at': updated_at})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks/<task_id>', methods=['DELETE'])
+@api.route('/tasks/<task_id>', methods=['DELETE'])
 def delete_task(task_id):
     """删除任务"""
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+    ws = current_workspace()
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     if os.path.exists(filepath):
         os.remove(filepath)
         return jsonify({'success': True})
     return jsonify({'error': 'Task not found'}), 404
 
-@app.route('/api/tasks/archive/<task_id>', methods=['POST'])
+@api.route('/tasks/archive/<task_id>', methods=['POST'])
 def archive_task(task_id):
     """归档任务"""
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+    ws = current_workspace()
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     
     if not os.path.exists(filepath):
         return jsonify({'error': 'Task not found'}), 404
     
     try:
-        # 移动到归档目录
-        archive_path = os.path.join(ARCHIVED_DIR, f"{task_id}.md")
-        
         # 添加归档标记到内容
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -425,8 +1349,8 @@ def archive_task(task_id):
         archived_at = datetime.now().strftime('%Y-%m-%d %H:%M')
         content = f"---\narchived_at: {archived_at}\n---\n\n{content}"
         
-        with open(archive_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # 追加到归档段
+        ws.archive.put(task_id, content)
         
         # 删除原文件
         os.remove(filepath)
@@ -438,9 +1362,10 @@ def archive_task(task_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks/move/<task_id>', methods=['POST'])
+@api.route('/tasks/move/<task_id>', methods=['POST'])
 def move_task(task_id):
     """移动任务状态"""
+    ws = current_workspace()
     data = request.json
     new_status = data.get('status', 'in_progress')  # planned, in_progress, completed
     
@@ -459,7 +1384,7 @@ def move_task(task_id):
     status_icon = status_map.get(new_status, '🔄')
     status_text = status_text_map.get(new_status, '进行中')
     
-    filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+    filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
     
     if not os.path.exists(filepath):
         return jsonify({'error': 'Task not found'}), 404
@@ -467,6 +1392,7 @@ def move_task(task_id):
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
+        old_content = content
         
         updated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
         
@@ -510,6 +1436,7 @@ def move_task(task_id):
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
+        record_status_change(ws, filepath, old_content, content)
         
         return jsonify({
             'success': True,
@@ -519,70 +1446,73 @@ def move_task(task_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/archive')
+@api.route('/archive')
 def get_archived_tasks():
     """获取归档任务列表"""
-    tasks = get_all_tasks_from_dir(ARCHIVED_DIR)
+    ws = current_workspace()
+    tasks = []
+    for record, archived_at in ws.archive.records():
+        task = record.to_dict()
+        task['archived_at'] = archived_at
+        tasks.append(task)
     return jsonify({
         'archived': tasks,
         'count': len(tasks)
     })
 
-@app.route('/api/archive/<task_id>', methods=['POST'])
+@api.route('/archive/<task_id>', methods=['POST'])
 def restore_archived_task(task_id):
     """恢复归档任务"""
-    archive_path = os.path.join(ARCHIVED_DIR, f"{task_id}.md")
+    ws = current_workspace()
+    content = ws.archive.get(task_id)
     
-    if not os.path.exists(archive_path):
+    if content is None:
         return jsonify({'error': 'Archived task not found'}), 404
     
     try:
-        with open(archive_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # 移除归档标记
         content = re.sub(r'^---\n.*?---\n', '', content, flags=re.DOTALL)
         
         # 移动回任务目录
-        filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+        filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        # 删除归档文件
-        os.remove(archive_path)
+        # 写入归档删除标记
+        ws.archive.delete(task_id)
         
         return jsonify({'success': True, 'message': '任务已恢复'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/archive/<task_id>', methods=['DELETE'])
+@api.route('/archive/<task_id>', methods=['DELETE'])
 def delete_archived_task(task_id):
     """永久删除归档任务"""
-    archive_path = os.path.join(ARCHIVED_DIR, f"{task_id}.md")
-    
-    if not os.path.exists(archive_path):
-        return jsonify({'error': 'Archived task not found'}), 404
+    ws = current_workspace()
     
     try:
-        os.remove(archive_path)
+        if not ws.archive.delete(task_id):
+            return jsonify({'error': 'Archived task not found'}), 404
         return jsonify({'success': True, 'message': '任务已永久删除'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/sessions/send', methods=['POST'])
+@api.route('/sessions/send', methods=['POST'])
 def send_to_session():
     """发送消息到 OpenClaw 会话"""
+    ws = current_workspace()
     data = request.json
     task_id = data.get('task_id')
     message = data.get('message')
     
     # 记录到任务文件
     if task_id:
-        filepath = os.path.join(TASKS_DIR, f"{task_id}.md")
+        filepath = os.path.join(ws.tasks_dir, f"{task_id}.md")
         if os.path.exists(filepath):
             updated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
+            old_content = content
             
             # 添加消息记录
             content = re.sub(
@@ -600,6 +1530,7 @@ def send_to_session():
             
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
+            record_status_change(ws, filepath, old_content, content)
     
     return jsonify({
         'success': True,
@@ -607,24 +1538,26 @@ def send_to_session():
         'response': f'收到消息: {message}'
     })
 
-@app.route('/api/stats')
+@api.route('/stats')
 def get_stats():
     """获取统计信息"""
-    tasks = get_all_tasks_from_dir(TASKS_DIR)
+    ws = current_workspace()
+    # 统计只需状态与智能体，直接使用索引记录，无需展开为 dict
+    tasks = get_task_records_from_dir(ws.tasks_dir)
     
     # 计算统计数据
     total = len(tasks)
-    completed = len([t for t in tasks if t['status'] == '✅'])
-    in_progress = len([t for t in tasks if t['status'] == '🔄'])
+    completed = len([t for t in tasks if t.status == '✅'])
+    in_progress = len([t for t in tasks if t.status == '🔄'])
     
     # 按智能体统计
     by_agent = {}
     for task in tasks:
-        agent = task['agent_name']
+        agent = task.agent_name
         if agent not in by_agent:
             by_agent[agent] = {'total': 0, 'completed': 0}
         by_agent[agent]['total'] += 1
-        if task['status'] == '✅':
+        if task.status == '✅':
             by_agent[agent]['completed'] += 1
     
     return jsonify({
@@ -636,62 +1569,372 @@ def get_stats():
         'by_agent': by_agent
     })
 
-@app.route('/api/health')
+def _parse_history_time(value, default):
+    """解析 epoch 秒或 ISO 时间"""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def _parse_history_step(value, span):
+    """解析 step: minute/hour/day、秒数或 15m/6h/7d，缺省按时间跨度选择"""
+    if not value:
+        if span <= 3 * 3600:
+            return 60
+        if span <= 7 * 86400:
+            return 3600
+        return 86400
+    names = {name: size for name, size, _ in HISTORY_LEVELS}
+    if value in names:
+        return names[value]
+    units = {'m': 60, 'h': 3600, 'd': 86400}
+    if value[-1] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
+
+@api.route('/stats/history')
+def get_stats_history():
+    """获取统计历史（吞吐量、周期时间、完成率趋势）"""
+    ws = current_workspace()
+    now = time.time()
+    try:
+        end = _parse_history_time(request.args.get('to'), now)
+        start = _parse_history_time(request.args.get('from'), end - 86400)
+        step = _parse_history_step(request.args.get('step'), end - start)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+    
+    if step <= 0 or step % 60 != 0:
+        return jsonify({'error': 'step must be a positive multiple of 60 seconds'}), 400
+    if end <= start:
+        return jsonify({'error': '"from" must be earlier than "to"'}), 400
+    if (end - start) / step > HISTORY_MAX_POINTS:
+        return jsonify({'error': f'Too many points, use a larger step (max {HISTORY_MAX_POINTS})'}), 400
+    
+    agent = request.args.get('agent')
+    level, points = ws.history.query(start, end, step, agent)
+    
+    return jsonify({
+        'from': datetime.fromtimestamp(start).isoformat(),
+        'to': datetime.fromtimestamp(end).isoformat(),
+        'step': step,
+        'level': level,
+        'agent': agent,
+        'points': points
+    })
+
+@api.route('/health')
 def health_check():
     """健康检查"""
+    ws = current_workspace()
     return jsonify({
         'status': 'ok',
         'timestamp': datetime.now().isoformat(),
-        'tasks_dir': TASKS_DIR,
-        'archived_dir': ARCHIVED_DIR
+        'workspace': ws.name,
+        'tasks_dir': ws.tasks_dir,
+        'archived_dir': ws.archived_dir,
+        'scans': get_task_index(ws.tasks_dir).scan_stats()
     })
 
 # 🟢 P2: UltraWork 格式支持
-@app.route('/api/ultrawork/parse', methods=['POST'])
+class UltraWorkParser:
+    r"""UltraWork 增量解析器
+
+    逐行读取，线性时间识别 Phase / Task / 复选框，只在内存中保留当前 Phase。
+    Phase 边界与原 DOTALL 正则一致：从 "Phase N" 开始，到下一个 "Phase N" 或 "## " 结束；
+    Task 数量为 "Task N" 出现的次数。
+    有意的差异：复选框文本只取本行。原正则 `- \[ \]\s*(.+)` 的 `\s*` 会跨过换行，
+    把 "- [x]" 后的下一行（甚至下一个复选框）当作任务名；这里空文本的复选框直接忽略。
+    """
+    _boundary = re.compile(r'## |Phase \d+')
+    _checkbox = re.compile(r'- \[ \]\s*(.+)|- \[x\]\s*(.+)')
+    _task = re.compile(r'Task \d+')
+
+    def __init__(self):
+        self.title = None
+        self.total_phases = 0
+        self.total_tasks = 0
+        self._phase = None  # (名称, [(子任务, 是否完成)])
+
+    def feed(self, line):
+        """解析一行（不含换行符），返回本行结束的 Phase 列表"""
+        closed = []
+        self.total_tasks += len(self._task.findall(line))
+        if self.title is None and self.total_phases == 0 and line.startswith('# '):
+            self.title = line[2:].strip()
+
+        pos = 0
+        for match in self._boundary.finditer(line):
+            self._scan(line[pos:match.start()])
+            phase = self._close_phase()
+            if phase:
+                closed.append(phase)
+            if match.group() != '## ':
+                following = self._boundary.search(line, match.end())
+                name = line[match.start():following.start() if following else len(line)].strip()
+                self._phase = (name, [])
+            pos = match.start()
+        self._scan(line[pos:])
+        return closed
+
+    def close(self):
+        """输入结束，返回最后一个未结束的 Phase 列表"""
+        phase = self._close_phase()
+        return [phase] if phase else []
+
+    def _scan(self, text):
+        if self._phase is None or not text:
+            return
+        for unchecked, checked in self._checkbox.findall(text):
+            self._phase[1].append((unchecked or checked, bool(checked)))
+
+    def _close_phase(self):
+        if self._phase is None:
+            return None
+        name, tasks = self._phase
+        self._phase = None
+        self.total_phases += 1
+        completed = sum(1 for _, done in tasks if done)
+        return {
+            'id': f'phase_{self.total_phases}',
+            'name': name,
+            'tasks': [{'name': task, 'completed': done} for task, done in tasks],
+            'progress': int(completed / len(tasks) * 100) if tasks else 0
+        }
+
+class ChecklistWriter:
+    """把流式解析出的 Phase 逐个写入新的任务清单文件（create_task 模板）
+
+    先写入同目录的 .tmp 文件，完成后原子替换为 <task_id>.md。
+    """
+
+    def __init__(self, tasks_dir, title, owner, agent, sort_order):
+        self.task_id = _new_task_id(tasks_dir)
+        self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+        self.filepath = os.path.join(tasks_dir, f"{self.task_id}.md")
+        self._tmp_path = self.filepath + '.tmp'
+        self._title = title
+        self._meta = (owner, agent, sort_order)
+        self._header_written = False
+        self.committed = False
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def write_phase(self, phase, parsed_title=None):
+        self._write_header(parsed_title)
+        self._file.write(render_phase_section(phase['name'], [(t['name'], t['completed']) for t in phase['tasks']]))
+
+    def commit(self, parsed_title=None):
+        self._write_header(parsed_title)
+        self._file.write(render_task_footer(self.created_at, 'UltraWork 导入'))
+        self._file.close()
+        os.replace(self._tmp_path, self.filepath)
+        self.committed = True
+        get_task_index(os.path.dirname(self.filepath)).invalidate()
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def _write_header(self, parsed_title):
+        if self._header_written:
+            return
+        title = self._title
+        if not title and parsed_title:
+            title = re.sub(r'^任务清单[:：]?\s*', '', parsed_title) or None
+        owner, agent, sort_order = self._meta
+        self._file.write(render_task_header(title or '新任务', owner, agent, sort_order, self.created_at))
+        self._header_written = True
+
+_task_id_lock = threading.Lock()
+
+def _new_task_id(tasks_dir):
+    """生成不与现有文件冲突的任务ID（同一秒内追加序号）"""
+    with _task_id_lock:
+        base = datetime.now().strftime('%Y%m%d%H%M%S')
+        task_id, n = base, 1
+        while os.path.exists(os.path.join(tasks_dir, f"{task_id}.md")) or \
+                os.path.exists(os.path.join(tasks_dir, f"{task_id}.md.tmp")):
+            task_id = f"{base}_{n}"
+            n += 1
+        # 先占位，防止并发导入拿到相同ID
+        open(os.path.join(tasks_dir, f"{task_id}.md.tmp"), 'w').close()
+        return task_id
+
+def _read_lines(stream, limit):
+    """按行读取字节流，超过 limit 的行丢弃剩余部分并返回 None"""
+    while True:
+        line = stream.readline(limit + 1)
+        if not line:
+            return
+        if len(line) > limit and not line.endswith(b'\n'):
+            while True:
+                rest = stream.readline(limit)
+                if not rest or rest.endswith(b'\n'):
+                    break
+            yield None
+            continue
+        yield line
+
+def _ndjson(event):
+    return json.dumps(event, ensure_ascii=False) + '\n'
+
+def _parse_document(lines, doc, writer=None):
+    """增量解析单个文档，逐个产出 phase 事件，最后产出 document 事件"""
+    parser = UltraWorkParser()
+    try:
+        for line in lines:
+            for phase in parser.feed(line):
+                if writer:
+                    writer.write_phase(phase, parser.title)
+                yield {'type': 'phase', 'document': doc, 'phase': phase}
+        for phase in parser.close():
+            if writer:
+                writer.write_phase(phase, parser.title)
+            yield {'type': 'phase', 'document': doc, 'phase': phase}
+        if writer:
+            writer.commit(parser.title)
+    finally:
+        # 出错或客户端断开（GeneratorExit）时清理临时文件与占位文件
+        if writer and not writer.committed:
+            writer.abort()
+    yield {
+        'type': 'document',
+        'document': doc,
+        'title': parser.title,
+        'total_phases': parser.total_phases,
+        'total_tasks': parser.total_tasks,
+        'task_id': writer.task_id if writer else None
+    }
+
+def _stream_ultrawork(ws, stream, ndjson, options):
+    """流式导入: Markdown 正文或 NDJSON 多文档，逐行产出 NDJSON 事件"""
+    materialize = options.get('materialize') in ('1', 'true')
+    defaults = {
+        'title': options.get('title'),
+        'owner': options.get('owner', '未分配'),
+        'agent': options.get('agent', '老丑'),
+        'sort_order': options.get('sort_order', 999)
+    }
+    summary = {'type': 'summary', 'documents': 0, 'total_phases': 0, 'total_tasks': 0, 'errors': 0}
+
+    def make_writer(meta):
+        if not materialize:
+            return None
+        return ChecklistWriter(ws.tasks_dir, meta['title'], meta['owner'], meta['agent'], meta['sort_order'])
+
+    def run(doc, lines, meta):
+        writer = make_writer(meta)
+        events = _parse_document(lines, doc, writer)
+        try:
+            for event in events:
+                if event['type'] == 'document':
+                    summary['documents'] += 1
+                    summary['total_phases'] += event['total_phases']
+                    summary['total_tasks'] += event['total_tasks']
+                yield _ndjson(event)
+        finally:
+            # 显式关闭，确保断开时 _parse_document 立即清理
+            events.close()
+            if writer and not writer.committed:
+                writer.abort()
+
+    def error(doc, message):
+        summary['errors'] += 1
+        return _ndjson({'type': 'error', 'document': doc, 'error': message})
+
+    if not ndjson:
+        def markdown_lines():
+            for line in _read_lines(stream, ULTRAWORK_MAX_LINE_BYTES):
+                # 超长行按空行处理，不影响后续解析
+                yield line.decode('utf-8', errors='replace').rstrip('\r\n') if line is not None else ''
+        try:
+            yield from run(0, markdown_lines(), defaults)
+        except Exception as e:
+            yield error(0, str(e))
+    else:
+        doc = 0
+        for line in _read_lines(stream, ULTRAWORK_MAX_DOCUMENT_BYTES):
+            if line is None:
+                yield error(doc, f'Document exceeds {ULTRAWORK_MAX_DOCUMENT_BYTES} bytes')
+                doc += 1
+                continue
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                content = data['content'] if isinstance(data, dict) else data
+                meta = {key: data.get(key, value) for key, value in defaults.items()} if isinstance(data, dict) else defaults
+                yield from run(doc, _iter_lines(content), meta)
+            except Exception as e:
+                yield error(doc, str(e))
+            doc += 1
+
+    yield _ndjson(summary)
+
+def _iter_lines(content):
+    """逐行迭代字符串，不复制整份行列表"""
+    start = 0
+    while True:
+        end = content.find('\n', start)
+        if end == -1:
+            yield content[start:]
+            return
+        yield content[start:end]
+        start = end + 1
+
+@api.route('/ultrawork/parse', methods=['POST'])
 def parse_ultrawork():
-    """解析 UltraWork 任务格式"""
+    """解析 UltraWork 任务格式
+
+    application/json: {"content": "..."}，一次性返回结果
+    text/markdown、text/plain: 流式 Markdown 正文；application/x-ndjson: 每行一个
+    {"content": ..., "title": ..., "owner": ..., "agent": ..., "sort_order": ...} 文档。
+    流式模式以 NDJSON 逐个返回 phase / document / error 事件，最后返回 summary；
+    ?materialize=1 时把每个文档按 create_task 模板写入任务目录。
+    """
+    if request.mimetype in ('text/markdown', 'text/plain', 'application/x-ndjson'):
+        ws = current_workspace()
+        return Response(
+            stream_with_context(_stream_ultrawork(
+                ws, request.stream, request.mimetype == 'application/x-ndjson', request.args
+            )),
+            mimetype='application/x-ndjson'
+        )
+    
     data = request.json
     content = data.get('content', '')
     
     # UltraWork 格式: Phase 1: xxx / Task 1: xxx
-    phases = re.findall(r'(Phase \d+[:：]?\s*(?:.*?))(?=Phase \d+|## |$)', content, re.DOTALL)
-    tasks = re.findall(r'(Task \d+[:：]?\s*(?:.*?))(?=Task \d+|Phase|## |$)', content, re.DOTALL)
-    
+    parser = UltraWorkParser()
     phase_list = []
-    for i, phase in enumerate(phases):
-        phase_name = phase.split('\n')[0].strip()
-        phase_tasks = re.findall(r'- \[ \]\s*(.+)|- \[x\]\s*(.+)', phase)
-        completed = sum(1 for t in phase_tasks if t[1])
-        total = len(phase_tasks)
-        phase_list.append({
-            'id': f'phase_{i+1}',
-            'name': phase_name,
-            'tasks': [{'name': t[0] or t[1], 'completed': bool(t[1])} for t in phase_tasks],
-            'progress': int(completed / total * 100) if total > 0 else 0
-        })
+    for line in _iter_lines(content):
+        phase_list.extend(parser.feed(line))
+    phase_list.extend(parser.close())
     
     return jsonify({
         'phases': phase_list,
         'total_phases': len(phase_list),
-        'total_tasks': len(tasks)
+        'total_tasks': parser.total_tasks
     })
 
 # 🟡 P1: Jobs 任务 API (定时/轮巡任务)
-JOBS_FILE = os.path.join(TASKS_DIR, '..', 'jobs.json')
-
 def get_jobs():
-    """获取 Jobs 列表"""
-    if os.path.exists(JOBS_FILE):
-        with open(JOBS_FILE, 'r', encoding='utf-8') as f:
+    """获取当前工作区的 Jobs 列表"""
+    jobs_file = current_workspace().jobs_file
+    if os.path.exists(jobs_file):
+        with open(jobs_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     return []
 
 def save_jobs(jobs):
-    """保存 Jobs 列表"""
-    with open(JOBS_FILE, 'w', encoding='utf-8') as f:
+    """保存当前工作区的 Jobs 列表"""
+    with open(current_workspace().jobs_file, 'w', encoding='utf-8') as f:
         json.dump(jobs, f, ensure_ascii=False, indent=2)
 
-@app.route('/api/jobs')
+@api.route('/jobs')
 def get_jobs_list():
     """获取所有 Jobs"""
     jobs = get_jobs()
@@ -700,7 +1943,7 @@ def get_jobs_list():
         'count': len(jobs)
     })
 
-@app.route('/api/jobs', methods=['POST'])
+@api.route('/jobs', methods=['POST'])
 def create_job():
     """创建新 Job"""
     data = request.json
@@ -726,7 +1969,7 @@ def create_job():
         'job': job
     })
 
-@app.route('/api/jobs/<job_id>', methods=['PUT'])
+@api.route('/jobs/<job_id>', methods=['PUT'])
 def update_job(job_id):
     """更新 Job"""
     data = request.json
@@ -746,7 +1989,7 @@ def update_job(job_id):
     
     return jsonify({'error': 'Job not found'}), 404
 
-@app.route('/api/jobs/<job_id>/run', methods=['POST'])
+@api.route('/jobs/<job_id>/run', methods=['POST'])
 def run_job(job_id):
     """手动运行 Job"""
     jobs = get_jobs()
@@ -768,7 +2011,7 @@ def run_job(job_id):
     
     return jsonify({'error': 'Job not found'}), 404
 
-@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+@api.route('/jobs/<job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """删除 Job"""
     jobs = get_jobs()
@@ -776,5 +2019,8 @@ def delete_job(job_id):
     save_jobs(jobs)
     return jsonify({'success': True})
 
+app.register_blueprint(api, url_prefix='/api')
+app.register_blueprint(api, url_prefix='/api/w/<workspace>', name='workspace_api')
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
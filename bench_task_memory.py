@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务索引内存基准：对比 dict 任务与 TaskRecord 的常驻字节数
+
+用法: python bench_task_memory.py [任务数量]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+
+TEMPLATE = """# 任务清单：任务 {i}
+
+- 状态: {status}
+- 创建时间: 2026-02-12 10:00
+- 更新时间: 2026-02-12 11:00
+- 负责人: {agent}
+- 排序: {order}
+- [{icon} {agent}]
+
+## 任务描述
+
+示例任务描述
+
+## Phase 1: 准备阶段
+
+- [x] 明确任务目标和范围
+- [x] 制定详细计划
+- [ ] 分配资源
+
+## Phase 2: 执行阶段
+
+- [x] 执行核心任务
+- [ ] 定期检查进度
+- [ ] 解决遇到的问题
+
+## Phase 3: 收尾阶段
+
+- [ ] 完成任务验收
+- [ ] 编写文档
+- [ ] 总结经验
+
+## 执行记录
+
+2026-02-12 10:00: 任务创建
+2026-02-12 10:30: 开始执行
+
+## 阻塞点
+
+无
+"""
+
+def _measure(build):
+    """返回 build() 结果常驻的字节数"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return result, size
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    statuses = ['🔄 进行中', '✅ 已完成', '❌ 已暂停']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks_dir = os.path.join(tmp, 'checklists')
+        os.makedirs(tasks_dir)
+        os.environ['TASKS_DIR'] = tasks_dir
+        os.environ['ARCHIVED_DIR'] = os.path.join(tmp, 'archived')
+
+        import app
+
+        agents = list(app.AGENT_ICONS.items())
+        contents = []
+        for i in range(count):
+            agent, icon = agents[i % len(agents)]
+            content = TEMPLATE.format(i=i, status=statuses[i % len(statuses)],
+                                      agent=agent, icon=icon, order=i % 100)
+            filepath = os.path.join(tasks_dir, f'2026{i:010d}.md')
+            contents.append((content, filepath))
+
+        dicts, dict_bytes = _measure(lambda: [app._parse_content(c, p) for c, p in contents])
+        del dicts
+        records, record_bytes = _measure(lambda: [app._parse_record(c, p) for c, p in contents])
+        del records
+
+    print(f"tasks:            {count}")
+    print(f"dict   bytes/task: {dict_bytes / count:8.0f}")
+    print(f"record bytes/task: {record_bytes / count:8.0f}")
+    print(f"saving:            {(1 - record_bytes / dict_bytes) * 100:7.1f}%")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import tempfile
+
+# app 在导入时读取目录配置，测试前指向临时目录
+_root = tempfile.mkdtemp(prefix='task-dashboard-')
+os.environ.setdefault('TASKS_DIR', os.path.join(_root, 'checklists'))
+os.environ.setdefault('ARCHIVED_DIR', os.path.join(_root, 'archived'))
+os.makedirs(os.environ['TASKS_DIR'], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
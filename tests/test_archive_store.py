@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""归档段存储测试"""
+import os
+
+import app
+
+
+def _content(title, archived_at='2026-01-01 10:00'):
+    return f"---\narchived_at: {archived_at}\n---\n\n# 任务清单：{title}\n\n- 状态: ✅ 已完成\n"
+
+
+def _write(path, content, mode='w'):
+    with open(path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        f.write(content)
+
+
+def test_legacy_import_skips_unreadable_files(tmp_path):
+    _write(tmp_path / 'a.md', _content('A'))
+    _write(tmp_path / 'b.md', b'# \xff\xfe bad\n', 'wb')
+    _write(tmp_path / 'c.md', _content('C'))
+
+    store = app.ArchiveStore(str(tmp_path))
+    titles = sorted(record.title for record, _ in store.records())
+
+    assert titles == ['A', 'C']
+    assert (tmp_path / 'b.md').exists()
+    assert not (tmp_path / 'a.md').exists()
+    assert (tmp_path / 'legacy' / 'a.md').exists()
+    assert (tmp_path / 'legacy' / 'c.md').exists()
+
+    # 重新打开后只剩无法读取的文件，不会重复导入
+    reopened = app.ArchiveStore(str(tmp_path))
+    assert sorted(record.title for record, _ in reopened.records()) == ['A', 'C']
+
+
+def test_put_get_delete_and_reopen(tmp_path):
+    store = app.ArchiveStore(str(tmp_path))
+    store.put('t1', _content('一'))
+    store.put('t2', _content('二', '2026-02-02 08:00'))
+
+    assert store.get('t1') == _content('一')
+    assert dict((r.id, at) for r, at in store.records()) == {'t1': '2026-01-01 10:00', 't2': '2026-02-02 08:00'}
+
+    # 恢复/删除都写 tombstone
+    assert store.delete('t1')
+    assert not store.delete('t1')
+    assert store.get('t1') is None
+
+    reopened = app.ArchiveStore(str(tmp_path))
+    assert reopened.get('t1') is None
+    assert reopened.get('t2') == _content('二', '2026-02-02 08:00')
+
+
+def test_compaction_drops_dead_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'ARCHIVE_SEGMENT_MAX_BYTES', 200)
+    store = app.ArchiveStore(str(tmp_path))
+    # 禁用后台压缩，改为同步调用
+    monkeypatch.setattr(store, '_maybe_compact', lambda: None)
+    for i in range(10):
+        store.put(f't{i}', _content(f'任务{i}' * 5))
+    segments_before = store._segment_numbers()
+    assert len(segments_before) > 2
+
+    for i in range(8):
+        store.delete(f't{i}')
+    store.compact()
+
+    assert store._segment_numbers() != segments_before
+    assert len(store._segment_numbers()) < len(segments_before)
+    assert sorted(r.id for r, _ in store.records()) == ['t8', 't9']
+    assert store.get('t9') == _content('任务9' * 5)
+
+    reopened = app.ArchiveStore(str(tmp_path))
+    assert sorted(r.id for r, _ in reopened.records()) == ['t8', 't9']
+    assert reopened.get('t8') == _content('任务8' * 5)
+
+
+def test_archive_and_restore_routes(tmp_path):
+    client = app.app.test_client()
+    ws = app.WORKSPACE_MAP[app.DEFAULT_WORKSPACE]
+    task_id = client.post('/api/tasks', json={'title': '归档测试'}).json['task_id']
+
+    assert client.post(f'/api/tasks/archive/{task_id}').json['success']
+    assert not os.path.exists(os.path.join(ws.tasks_dir, f'{task_id}.md'))
+    archived = {t['id']: t for t in client.get('/api/archive').json['archived']}
+    assert archived[task_id]['title'] == '归档测试'
+    assert archived[task_id]['archived_at']
+
+    assert client.post(f'/api/archive/{task_id}').json['success']
+    with open(os.path.join(ws.tasks_dir, f'{task_id}.md'), encoding='utf-8') as f:
+        assert not f.read().lstrip().startswith('---')
+    assert client.post(f'/api/archive/{task_id}').status_code == 404
+    assert client.delete(f'/api/archive/{task_id}').status_code == 404
+
+
+def test_reopen_with_torn_index_line(tmp_path):
+    store = app.ArchiveStore(str(tmp_path))
+    store.put('x', _content('X'))
+    _write(tmp_path / 'archive.idx', '{"id":"y","seg":1,"of', 'a')
+
+    reopened = app.ArchiveStore(str(tmp_path))
+    assert [r.id for r, _ in reopened.records()] == ['x']
+
+    # 截断后新的追加从完整行开始
+    reopened.put('z', _content('Z'))
+    again = app.ArchiveStore(str(tmp_path))
+    assert sorted(r.id for r, _ in again.records()) == ['x', 'z']
+    assert again.get('z') == _content('Z')
+
+
+def test_corrupt_record_is_skipped_in_listing(tmp_path):
+    store = app.ArchiveStore(str(tmp_path))
+    store.put('good', _content('好'))
+    store.put('bad', _content('坏'))
+    segment, offset, length, _ = store._entries['bad']
+    with open(store._segment_path(segment), 'r+b') as f:
+        f.seek(offset)
+        f.write(b'\x00' * length)
+
+    reopened = app.ArchiveStore(str(tmp_path))
+    assert [r.id for r, _ in reopened.records()] == ['good']
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""统计历史测试"""
+import time
+
+import app
+
+
+def _totals(history, step, start, end):
+    level, points = history.query(start, end, step)
+    return sum(p['throughput'] for p in points), sum(p['transitions'] for p in points)
+
+
+def test_open_buckets_survive_unclean_exit(tmp_path):
+    now = time.time()
+    history = app.StatsHistory(str(tmp_path))
+    for _ in range(3):
+        history.record_transition('老丑', '🔄', '✅', 3600, ts=now)
+    history.record_snapshot({'老丑': (5, 3)}, ts=now)
+    history.record_transition('钮码', '🔄', '✅', ts=now)
+
+    # 不调用 flush()，模拟 SIGTERM 后重启
+    reopened = app.StatsHistory(str(tmp_path))
+    for step in (60, 3600, 86400):
+        assert _totals(reopened, step, now - 86400, now + 60) == (4, 4)
+
+    level, points = reopened.query(now - 86400, now + 60, 86400)
+    assert points[-1]['total'] == 5
+    assert points[-1]['avg_cycle_hours'] == 1.0
+
+
+def test_replay_after_rollover_does_not_double_count(tmp_path):
+    now = time.time()
+    history = app.StatsHistory(str(tmp_path))
+    # 跨越多个分钟桶，旧桶在写入过程中落盘
+    for i in range(5):
+        history.record_transition('丑牛', '🔄', '✅', ts=now - 600 + i * 120)
+
+    reopened = app.StatsHistory(str(tmp_path))
+    assert _totals(reopened, 60, now - 3600, now + 60) == (5, 5)
+
+    # 正常退出后再次打开也保持一致
+    reopened.flush()
+    again = app.StatsHistory(str(tmp_path))
+    assert _totals(again, 60, now - 3600, now + 60) == (5, 5)
+    assert _totals(again, 3600, now - 86400, now + 60) == (5, 5)
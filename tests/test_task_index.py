@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""目录扫描单飞合并测试"""
+import threading
+import time
+
+import pytest
+
+import app
+
+
+class _GatedScan:
+    """替换 TaskIndex._scan：阻塞到 release()，并记录调用次数"""
+
+    def __init__(self, error=None):
+        self.gate = threading.Event()
+        self.calls = 0
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        call = self.calls
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [f'scan-{call}']
+
+    def release(self):
+        self.gate.set()
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def _call_in_threads(index, count):
+    results = [None] * count
+
+    def run(i):
+        try:
+            results[i] = index.records()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: index.scan_stats()['requests'] == count)
+    return threads, results
+
+
+def test_concurrent_callers_share_one_scan(tmp_path, monkeypatch):
+    index = app.TaskIndex(str(tmp_path))
+    scan = _GatedScan()
+    monkeypatch.setattr(index, '_scan', scan)
+
+    threads, results = _call_in_threads(index, 20)
+    scan.release()
+    for t in threads:
+        t.join()
+
+    stats = index.scan_stats()
+    assert scan.calls == 1
+    assert (stats['scans'], stats['coalesced'], stats['requests']) == (1, 19, 20)
+    assert stats['recent_scans'][0]['served'] == 20
+    assert all(r is results[0] for r in results)
+
+
+def test_fresh_hit_within_window(tmp_path, monkeypatch):
+    index = app.TaskIndex(str(tmp_path))
+    scan = _GatedScan()
+    scan.release()
+    monkeypatch.setattr(index, '_scan', scan)
+
+    monkeypatch.setattr(app, 'SCAN_FRESHNESS', 60)
+    first = index.records()
+    assert index.records() is first
+    stats = index.scan_stats()
+    assert (stats['scans'], stats['fresh_hits']) == (1, 1)
+    assert stats['recent_scans'][0]['served'] == 2
+
+    monkeypatch.setattr(app, 'SCAN_FRESHNESS', 0)
+    assert index.records() == ['scan-2']
+    assert index.scan_stats()['scans'] == 2
+
+
+def test_invalidate_during_scan_forces_new_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'SCAN_FRESHNESS', 60)
+    index = app.TaskIndex(str(tmp_path))
+    scan = _GatedScan()
+    monkeypatch.setattr(index, '_scan', scan)
+
+    leader_threads, leader_results = _call_in_threads(index, 1)
+    _wait_for(lambda: scan.calls == 1)
+    index.invalidate()
+
+    # 失效后的请求不加入进行中的扫描
+    result = []
+    follower = threading.Thread(target=lambda: result.append(index.records()))
+    follower.start()
+    _wait_for(lambda: index.scan_stats()['requests'] == 2)
+    scan.release()
+    leader_threads[0].join()
+    follower.join()
+
+    assert leader_results == [['scan-1']]
+    assert result == [['scan-2']]
+    stats = index.scan_stats()
+    assert (stats['scans'], stats['coalesced']) == (2, 0)
+
+    # 第二次扫描属于新的 generation，在新鲜期内可复用
+    assert index.records() == ['scan-2']
+    assert index.scan_stats()['fresh_hits'] == 1
+
+
+def test_scan_error_reaches_all_waiters(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'SCAN_FRESHNESS', 60)
+    index = app.TaskIndex(str(tmp_path))
+    error = OSError('disk gone')
+    scan = _GatedScan(error)
+    monkeypatch.setattr(index, '_scan', scan)
+
+    threads, results = _call_in_threads(index, 5)
+    scan.release()
+    for t in threads:
+        t.join()
+
+    assert scan.calls == 1
+    assert all(r is error for r in results)
+
+    # 失败的扫描不留下快照，下一次请求重新扫描
+    scan.error = None
+    assert index.records() == ['scan-2']
+    assert index.scan_stats()['fresh_hits'] == 0
+
+
+def test_real_scan_reflects_invalidate(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'SCAN_FRESHNESS', 60)
+    index = app.TaskIndex(str(tmp_path))
+    assert index.records() == []
+
+    (tmp_path / 'a.md').write_text('# 任务清单：A\n', encoding='utf-8')
+    assert index.records() == []  # 新鲜期内复用
+    index.invalidate()
+    assert [r.title for r in index.records()] == ['A']
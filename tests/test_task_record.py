@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""TaskRecord.to_dict() 与原 dict 结构一致性测试"""
+import app
+
+FILEPATH = '/data/checklists/20260212100000.md'
+
+MIXED = """# 任务清单：混合阶段
+- 状态: ✅ 已完成
+- 创建时间: 2026-02-12 10:00
+- 更新时间: 2026-02-13 09:30
+- 负责人: 小李
+- 排序: 7
+- [🟢 丑牛]
+
+## Phase 1: 调研
+
+- [x] a
+- [ ] b
+- [x] c
+
+## Phase 2: 实现
+
+{phase2}
+## Phase 3: 空
+
+## 执行记录
+
+2026-02-12 10:00: 一
+2026-02-12 11:00: 二
+2026-02-12 12:00: 三
+2026-02-12 13:00: 四
+2026-02-12 14:00: 五
+2026-02-12 15:00: 六
+
+## 阻塞点
+
+等待评审
+"""
+
+# 12 个子任务，完成位图超过一个字节
+PHASE2 = [(f'step {j}', j % 3 == 0 or j == 11) for j in range(12)]
+
+
+def _tasks(pairs):
+    return [{'name': name, 'completed': completed} for name, completed in pairs]
+
+
+def test_create_task_template_to_dict():
+    content = (
+        app.render_task_header('发布 v2', '小王', '钮码', 3, '2026-02-12 10:00')
+        + ''.join(app.render_phase_section(name, tasks) for name, tasks in app.DEFAULT_PHASES)
+        + app.render_task_footer('2026-02-12 10:00')
+    )
+
+    assert app._parse_record(content, FILEPATH).to_dict() == {
+        'id': '20260212100000',
+        'title': '发布 v2',
+        'status': '🔄',
+        'status_text': '进行中',
+        'agent_icon': '🔴',
+        'agent_name': '钮码',
+        'agent_color': 'red',
+        'sort_order': 3,
+        'progress': '0/9',
+        'progress_percent': 0,
+        'current_phase': 'Phase 1: 准备阶段',
+        'phase_list': [
+            {'id': f'phase_{i + 1}', 'name': name, 'tasks': _tasks(tasks), 'progress': 0}
+            for i, (name, tasks) in enumerate(app.DEFAULT_PHASES)
+        ],
+        'created_at': '2026-02-12 10:00',
+        'updated_at': '2026-02-12 10:00',
+        'owner': '小王',
+        'blocker': '<!-- 在此记录阻塞点 -->',
+        'execution_records': [{'time': '2026-02-12 10:00', 'action': '任务创建'}],
+        'filepath': FILEPATH,
+    }
+
+
+def test_mixed_phases_to_dict():
+    phase2 = ''.join(f"- [{'x' if done else ' '}] {name}\n" for name, done in PHASE2)
+    content = MIXED.replace('{phase2}', phase2)
+
+    record = app._parse_record(content, FILEPATH)
+    done = sum(1 for _, completed in PHASE2 if completed)
+    assert record.phases[1][2] == sum(1 << j for j, (_, completed) in enumerate(PHASE2) if completed)
+
+    assert record.to_dict() == {
+        'id': '20260212100000',
+        'title': '混合阶段',
+        'status': '✅',
+        'status_text': '已完成',
+        'agent_icon': '🟢',
+        'agent_name': '丑牛',
+        'agent_color': 'green',
+        'sort_order': 7,
+        'progress': f'{2 + done}/15',
+        'progress_percent': int((2 + done) / 15 * 100),
+        'current_phase': 'Phase 1: 调研',
+        'phase_list': [
+            {'id': 'phase_1', 'name': 'Phase 1: 调研',
+             'tasks': _tasks([('a', True), ('b', False), ('c', True)]), 'progress': 66},
+            {'id': 'phase_2', 'name': 'Phase 2: 实现',
+             'tasks': _tasks(PHASE2), 'progress': int(done / 12 * 100)},
+            {'id': 'phase_3', 'name': 'Phase 3: 空', 'tasks': [], 'progress': 0},
+        ],
+        'created_at': '2026-02-12 10:00',
+        'updated_at': '2026-02-13 09:30',
+        'owner': '小李',
+        'blocker': '等待评审',
+        # 最多保留前 5 条
+        'execution_records': [
+            {'time': '2026-02-12 10:00', 'action': '一'},
+            {'time': '2026-02-12 11:00', 'action': '二'},
+            {'time': '2026-02-12 12:00', 'action': '三'},
+            {'time': '2026-02-12 13:00', 'action': '四'},
+            {'time': '2026-02-12 14:00', 'action': '五'},
+        ],
+        'filepath': FILEPATH,
+    }
+
+
+def test_parse_content_matches_record():
+    content = MIXED.replace('{phase2}', '- [x] only\n')
+    task = app._parse_content(content, FILEPATH, include_full=True)
+    assert task.pop('full_content') == content
+    assert task == app._parse_record(content, FILEPATH).to_dict()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""UltraWork 流式导入测试"""
+import io
+import json
+import os
+
+import app
+
+
+def test_materialize_cleans_up_on_client_disconnect(tmp_path):
+    lines = iter(['# 计划', 'Phase 1: a', '- [ ] x', 'Phase 2: b', '- [x] y'])
+    writer = app.ChecklistWriter(str(tmp_path), None, '未分配', '老丑', 999)
+    events = app._parse_document(lines, 0, writer)
+
+    assert next(events)['type'] == 'phase'
+    events.close()  # 模拟客户端断开
+
+    assert os.listdir(tmp_path) == []
+    assert writer._file.closed
+
+
+def test_stream_disconnect_before_first_event(tmp_path):
+    ws = app.Workspace('t', str(tmp_path / 'tasks'), str(tmp_path / 'archived'))
+    os.makedirs(ws.tasks_dir, exist_ok=True)
+    body = json.dumps({'content': 'Phase 1: a\n- [ ] x'}).encode('utf-8') + b'\n'
+    stream = app._stream_ultrawork(ws, io.BytesIO(body), True, {'materialize': '1'})
+    stream.close()
+    assert os.listdir(ws.tasks_dir) == []
+
+    stream = app._stream_ultrawork(ws, io.BytesIO(body), True, {'materialize': '1'})
+    next(stream)
+    stream.close()
+    assert os.listdir(ws.tasks_dir) == []
+
+
+def test_materialize_writes_checklist(tmp_path):
+    lines = iter(['# 任务清单：计划', 'Phase 1: a', '- [ ] x', '- [x] y'])
+    writer = app.ChecklistWriter(str(tmp_path), None, '钮码', '钮码', 1)
+    events = list(app._parse_document(lines, 0, writer))
+
+    assert events[-1]['task_id'] == writer.task_id
+    assert os.listdir(tmp_path) == [f'{writer.task_id}.md']
+    task = app.parse_markdown_file(writer.filepath)
+    assert task['title'] == '计划'
+    assert task['agent_name'] == '钮码'
+    assert task['progress'] == '1/2'
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""多工作区测试"""
+import os
+
+import pytest
+
+import app
+
+
+def test_workspace_page_uses_workspace_api(tmp_path, monkeypatch):
+    ws = app.Workspace('lab', str(tmp_path / 'tasks'), str(tmp_path / 'archived'))
+    monkeypatch.setitem(app.WORKSPACE_MAP, 'lab', ws)
+    client = app.app.test_client()
+
+    page = client.get('/w/lab/').get_data(as_text=True)
+    assert 'const API_BASE = "/api/w/lab";' in page
+    assert "fetch('/api/" not in page
+
+    assert 'const API_BASE = "/api";' in client.get('/').get_data(as_text=True)
+    assert client.get('/w/missing/').status_code == 404
+
+
+def _workspace(tmp_path, name):
+    root = tmp_path / name / 'memory' / 'tasks'
+    ws = app.Workspace(name, str(root / 'checklists'), str(root / 'archived'))
+    os.makedirs(ws.tasks_dir, exist_ok=True)
+    return ws
+
+
+@pytest.fixture
+def workspaces(tmp_path, monkeypatch):
+    """default / lab 两个隔离的临时工作区"""
+    result = {}
+    for name in (app.DEFAULT_WORKSPACE, 'lab'):
+        result[name] = _workspace(tmp_path, name)
+        monkeypatch.setitem(app.WORKSPACE_MAP, name, result[name])
+    return result
+
+
+def _titles(response):
+    data = response.get_json()
+    return sorted(t['title'] for group in ('planned', 'in_progress', 'completed') for t in data[group])
+
+
+def test_api_routes_by_path_and_query(workspaces):
+    client = app.app.test_client()
+    assert client.post('/api/w/lab/tasks', json={'title': '实验'}).get_json()['success']
+    assert client.post('/api/tasks', json={'title': '默认'}).get_json()['success']
+
+    assert _titles(client.get('/api/w/lab/tasks')) == ['实验']
+    assert _titles(client.get('/api/tasks?workspace=lab')) == ['实验']
+    assert _titles(client.get('/api/tasks')) == ['默认']
+    assert _titles(client.get(f'/api/w/{app.DEFAULT_WORKSPACE}/tasks')) == ['默认']
+
+    assert os.listdir(workspaces['lab'].tasks_dir) != []
+    assert client.get('/api/w/lab/health').get_json()['workspace'] == 'lab'
+
+
+def test_unknown_workspace_returns_json_404(workspaces):
+    client = app.app.test_client()
+    for url in ('/api/w/missing/tasks', '/api/tasks?workspace=missing'):
+        response = client.get(url)
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'Workspace not found: missing'}
+
+    response = client.post('/api/w/missing/tasks', json={'title': 'x'})
+    assert response.status_code == 404
+    assert all(os.listdir(ws.tasks_dir) == [] for ws in workspaces.values())
+
+
+def test_jobs_are_isolated_per_workspace(workspaces):
+    client = app.app.test_client()
+    client.post('/api/w/lab/jobs', json={'name': '备份'})
+
+    assert [j['name'] for j in client.get('/api/w/lab/jobs').get_json()['jobs']] == ['备份']
+    assert client.get('/api/jobs').get_json()['count'] == 0
+    assert os.path.exists(workspaces['lab'].jobs_file)
+    assert not os.path.exists(workspaces[app.DEFAULT_WORKSPACE].jobs_file)
+
+
+def test_load_workspaces(tmp_path):
+    workspaces = app.load_workspaces(f' lab = {tmp_path / "lab"} ,,')
+    assert sorted(workspaces) == [app.DEFAULT_WORKSPACE, 'lab']
+    assert workspaces['lab'].tasks_dir == os.path.join(str(tmp_path / 'lab'), 'memory', 'tasks', 'checklists')
+
+    for spec in ('lab', 'lab=', f'={tmp_path}', f'ok={tmp_path / "ok"},bad'):
+        with pytest.raises(ValueError, match='Invalid WORKSPACES entry'):
+            app.load_workspaces(spec)